@@ -21,6 +21,8 @@ OUTPUT_DIR = os.path.join(ROOT_DIR, "output")
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, f"{datetime.now().strftime('%Y%m%d')}.xlsx")
 SETTING_FILE = os.path.join(ROOT_DIR, "settings.txt")
 AUTH_STATE_PATH = os.path.join(ROOT_DIR, "auth_state.json")
+# URLごとの前回取得時刻（スケジューラの優先度判定に使用）
+CRAWL_HISTORY_FILE = os.path.join(TMP_DIR, "crawl_history.json")
 
 
 # --- 実行時の基本設定 ---
@@ -28,6 +30,8 @@ AUTH_STATE_PATH = os.path.join(ROOT_DIR, "auth_state.json")
 MAX_PAGES_PER_COMPANY = 10
 # 中間保存を行う件数の目安（商品単位ではなく、結果の行数単位）
 SAVE_INTERVAL = 100
+# 商品一覧1ページあたりの商品数
+ITEMS_PER_PAGE = 120
 
 # --- 待機時間の設定（秒） ---
 WAIT_TIME_MIN = 2.0
@@ -36,6 +40,21 @@ WAIT_TIME_LOGIN = 5.0  # ログイン後の安定化待ち
 WAIT_TIME_ERROR = 10.0  # エラー発生時の冷却時間
 WAIT_TIME_MAINTENANCE = 20.0  # メンテナンス時の冷却時間
 MAX_RETRIS = 3
+# 巡回計画の所要時間見積もり用
+LIST_PAGE_WAIT = 1.5  # 一覧ページ間の平均待機時間
+PAGE_LOAD_TIME = 2.0  # 1ページの平均読み込み時間
+
+# --- スケジューラ設定 ---
+# 新着商品（未取得URL）の緊急度。既存商品の緊急度はこれ未満に抑える
+NEW_LISTING_URGENCY = 10.0
+# 前回取得からこの日数が経過するごとに既存商品の緊急度が1上がる
+STALE_DAYS = 7
+# 締切・リクエスト上限のうちURL収集（一覧ページ）に使ってよい割合
+LIST_PHASE_SHARE = 0.3
+# 1社のURL収集に最低限かかるリクエスト数（最大ページ数の取得 + 開始ページ）
+MIN_LIST_REQUESTS = 2
+# この日数より前に取得したURLは取得履歴から削除する
+CRAWL_HISTORY_RETENTION_DAYS = 90
 
 # --- ブラウザ設定 ---
 HEADLESS = True
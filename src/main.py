@@ -1,14 +1,16 @@
-import os
 import multiprocessing
+import os
 import random
 import time
-from typing import List
+from typing import Dict, List
 
-import pandas as pd
 from dotenv import load_dotenv
 
 import config
 from scraper.collector import SuperDeliveryScraper
+from scraper.models import PRODUCT_COLUMNS, ProductVariation
+from scraper.plan import load_plan
+from scraper.scheduler import CrawlScheduler
 from utils import io_handler
 from utils.logger import setup_logger
 
@@ -18,11 +20,54 @@ load_dotenv(config.SETTING_FILE)
 logger = setup_logger(config.TMP_LOG_DIR)
 
 
+def _flush_buffer(comp_name: str, buffer: List[ProductVariation]) -> None:
+    """会社ごとのバッファをCSVに追記し、空にする
+
+    :param comp_name: 会社名
+    :param buffer: 未保存の取得結果
+    """
+    temp_csv = os.path.join(config.TMP_CSV_DIR, f"{comp_name}.csv")
+    io_handler.save_to_csv_append(buffer, temp_csv, PRODUCT_COLUMNS)
+    buffer.clear()  # 書き込んだらメモリを空にする
+
+
+def _save_checkpoint(
+    buffers: Dict[str, List[ProductVariation]], history: Dict[str, float]
+) -> None:
+    """全社のバッファをCSVに追記してから取得履歴を保存する
+
+    履歴だけが先に保存されると、未保存の行が取得済みとして扱われるため必ずこの順で行う。
+
+    :param buffers: 会社名をキーにした未保存の取得結果
+    :param history: URLごとの前回取得時刻
+    """
+    for comp_name, buffer in buffers.items():
+        _flush_buffer(comp_name, buffer)
+    io_handler.save_crawl_history(
+        history, config.CRAWL_HISTORY_FILE, config.CRAWL_HISTORY_RETENTION_DAYS
+    )
+
+
 def main() -> None:
     """メイン処理を実行する"""
     # ファイル出力先のディレクトリ準備（念のため）
     io_handler.prepare_output_dir(config.OUTPUT_DIR)
 
+    # inputファイルと設定を読み込み、ブラウザ起動前に巡回計画を作成する
+    if not os.path.exists(config.INPUT_FILE):
+        logger.error("入力ファイルが見つかりません。終了します。")
+        return
+    try:
+        plan = load_plan(config.INPUT_FILE)
+    except ValueError as e:
+        logger.error(f"巡回計画の作成に失敗しました。終了します: {e}")
+        return
+    for line in plan.describe():
+        logger.info(line)
+    if plan.dry_run:
+        logger.info("DRY_RUNが有効のため、ブラウザを起動せずに終了します。")
+        return
+
     # ブラウザを開いてプログラム実行するかの判定
     headless = os.getenv("HEADLESS", "true").lower() == "true"
     # 初回はログインが必要なためauth_stateなしでブラウザ起動
@@ -39,60 +84,78 @@ def main() -> None:
         scraper.close()
         return
 
-    # inputファイルから会社名とURLを読み込む
-    if not os.path.exists(config.INPUT_FILE):
-        logger.error("入力ファイルが見つかりません。終了します。")
-        return
-    df_input = pd.read_excel(config.INPUT_FILE, header=None)
-
-    # ターゲット企業リストを読み込む
-    target_str = os.getenv("TARGET_COMPANIES", "")
-    target_list: List[str] = [t.strip() for t in target_str.split(",") if t.strip()]
+    # 前回取得時刻の履歴を読み込み、スケジューラを準備する
+    history = io_handler.load_crawl_history(config.CRAWL_HISTORY_FILE)
+    scheduler = CrawlScheduler(
+        history, deadline=plan.deadline, request_budget=plan.request_budget
+    )
 
     try:
-        # inputファイルの会社毎にループ処理
-        for _, row in df_input.iterrows():
-            comp_name = str(row[0]).strip()
-            b_url = str(row[1]).strip()
-            # 特定の企業のみ絞りたい場合は企業名が合致しなければスキップする
-            if target_list and comp_name not in target_list:
-                logger.info(f"=== [スキップ] {comp_name} ===")
+        # 1. 巡回計画の会社毎に商品URLを収集する（締切・上限の一部を各社で等分する）
+        listed = scheduler.plan_listing(
+            {name: c.weight for name, c in plan.companies.items()}, scraper.request_count
+        )
+        companies_left = len(listed)
+        for comp_name in listed:
+            company = plan.companies[comp_name]
+            if not scheduler.has_time() or not scheduler.has_budget(
+                scraper.request_count, config.MIN_LIST_REQUESTS
+            ):
+                logger.warning(f"=== [締切/上限到達のためスキップ] {comp_name} ===")
+                companies_left -= 1
                 continue
-            temp_csv = os.path.join(config.TMP_CSV_DIR, f"{comp_name}.csv")
 
-            logger.info(f"=== [処理開始] {comp_name} ===")
-            logger.info(f"URLリストを作成中...")
+            logger.info(f"=== [URL収集] {comp_name} ===")
+            should_stop = scheduler.listing_guard(
+                lambda: scraper.request_count, companies_left
+            )
+            list_started = time.time()
             all_urls = scraper.get_all_product_urls(
-                b_url,
-                start_page=int(os.getenv("START_PAGE")),
-                end_page=int(os.getenv("END_PAGE")),
+                company.url,
+                start_page=company.start_page,
+                end_page=company.end_page,
+                should_stop=should_stop,
             )
             logger.info(f"合計{len(all_urls)} 件のURLを検出しました。")
-
-            # 1件ずつ詳細を取得し、100件ごとにCSVへ逃がす
-            buffer = []
-            for i, url in enumerate(all_urls, start=1):
-                try:
-                    variations = scraper.scrape_product_detail(url)
-                    min_sleep = float(os.getenv("MIN_SLEEP", 2.0))
-                    max_sleep = float(os.getenv("MAX_SLEEP", 4.0))
-                    time.sleep(random.uniform(min_sleep, max_sleep))
-                    if variations:
-                        buffer.extend(variations)
-
-                    if i % config.SAVE_INTERVAL == 0:
-                        io_handler.save_to_csv_append(buffer, temp_csv)
-                        buffer = []  # 書き込んだらメモリを空にする
-                        logger.info(f"[中間保存] {i}件完了 (CSV追記済)")
-
-                except Exception as e:
-                    logger.error(f"{url}の処理中にエラー: {e}")
-                    time.sleep(10)  # エラー時は長めに休む
-
-            # 会社ごとの端数データを保存
-            if buffer:
-                io_handler.save_to_csv_append(buffer, temp_csv)
-                logger.info(f"[完了] {comp_name}の全データをCSVに保存しました。")
+            scheduler.add_company(
+                comp_name, all_urls, company.weight, list_cost=time.time() - list_started
+            )
+            companies_left -= 1
+
+        # 2. スケジューラの割り振り順に1件ずつ詳細を取得し、会社ごとに100件ごとにCSVへ逃がす
+        buffers: Dict[str, List[ProductVariation]] = {}
+        while True:
+            item = scheduler.next_item(scraper.request_count)
+            if item is None:
+                break
+            comp_name, url = item
+            company = plan.companies[comp_name]
+            buffer = buffers.setdefault(comp_name, [])
+            started = time.time()
+            succeeded = False
+            try:
+                variations = scraper.scrape_product_detail(url)
+                succeeded = True
+                time.sleep(random.uniform(company.min_sleep, company.max_sleep))
+                if variations:
+                    buffer.extend(variations)
+
+            except Exception as e:
+                logger.error(f"{url}の処理中にエラー: {e}")
+                time.sleep(10)  # エラー時は長めに休む
+
+            # 待機時間を含めた1件あたりの実測コストを記録する（失敗時は取得時刻を更新しない）
+            scheduler.record(comp_name, url, time.time() - started, succeeded)
+            fetched = scheduler.companies[comp_name].fetched
+            if fetched % config.SAVE_INTERVAL == 0:
+                _save_checkpoint(buffers, history)
+                logger.info(f"[中間保存] {comp_name}: {fetched}件完了 (CSV追記済)")
+
+        # 会社ごとの端数データを保存
+        _save_checkpoint(buffers, history)
+        for comp_name, remaining in scheduler.remaining().items():
+            fetched = scheduler.companies[comp_name].fetched
+            logger.info(f"[完了] {comp_name}: {fetched}件取得 / 未取得 {remaining}件")
 
         # 全社終了後にCSVをExcelに変換
         io_handler.convert_all_csv_to_excel(config.TMP_CSV_DIR, config.OUTPUT_FILE)
@@ -7,13 +7,18 @@ import random
 import re
 import sys
 import time
-from typing import List, Dict, Optional
+from typing import Callable, List, Optional
 
 import config
+from scraper.models import ProductVariation
 
 logger = logging.getLogger("SD_Scraper")
 
 
+class ScrapeFailedError(Exception):
+    """リトライしても商品詳細を取得できなかった場合の例外"""
+
+
 class SuperDeliveryScraper:
     def __init__(self) -> None:
         """コンストラクタ"""
@@ -22,6 +27,8 @@ class SuperDeliveryScraper:
         self.browser = None
         self.context = None
         self.page = None
+        # ページ遷移（リクエスト）の累計回数
+        self.request_count: int = 0
 
     def start(self, auth_state: Optional[str] = None, headless: bool = True) -> None:
         """ブラウザを起動する
@@ -81,7 +88,7 @@ class SuperDeliveryScraper:
         """
         try:
             logger.info("ログインを試みています...")
-            self.page.goto(self.login_url)
+            self._goto(self.login_url)
 
             # IDとパスワードを入力（locatorを使ってスマートに）
             self.page.locator('input[name="identification"]').fill(user_id)
@@ -117,7 +124,7 @@ class SuperDeliveryScraper:
 
         :return: 最大ページ数
         """
-        self.page.goto(first_page_url)
+        self._goto(first_page_url)
 
         # 「（全28020件）」というテキストを探して数字だけ抜く
         total_text = self.page.locator(r"text=/（全\d+件）/").first.inner_text()
@@ -125,20 +132,25 @@ class SuperDeliveryScraper:
         total_count = int(re.search(r"\d+", total_text).group())
 
         # 1ページあたりの件数を取得（動的に取れるならベストだが、一旦120で固定）
-        items_per_page = 120
+        items_per_page = config.ITEMS_PER_PAGE
 
         max_pages = math.ceil(total_count / items_per_page)
         logger.info(f"総件数: {total_count}件 -> 最大ページ数: {max_pages}")
         return max_pages
 
     def get_all_product_urls(
-        self, base_url: str, start_page: int = 1, end_page: int = 10
+        self,
+        base_url: str,
+        start_page: int = 1,
+        end_page: int = 10,
+        should_stop: Optional[Callable[[], bool]] = None,
     ) -> List[str]:
         """指摘したページ数までの商品一覧画面をスクレイピングし、全ての商品URLを取得する
 
         :param base_url: 1ページ目のURL（1ページ目のみURLが異なるため）
         :param start_page: URL取得開始ページ
         :param end_page: URL取得終了ページ
+        :param should_stop: Trueを返したら残りのページを巡回せずに打ち切る関数（開始ページは必ず巡回する）
 
         :return: 商品詳細URLのリスト
         """
@@ -162,6 +174,11 @@ class SuperDeliveryScraper:
         all_product_urls = []
 
         for page_num in range(start_page, actual_end_page + 1):
+            # 締切・上限の割り当てを使い切ったら打ち切る
+            if page_num > start_page and should_stop and should_stop():
+                logger.info(f"割り当てに達したため {page_num - 1} ページで URL収集を打ち切ります。")
+                break
+
             # 3. ページURLの生成
             if page_num == 1:
                 # 1ページ目は基本URLそのまま
@@ -201,7 +218,7 @@ class SuperDeliveryScraper:
         :return: 商品URLのリスト
         """
         logger.info(f"一覧ページに移動中: {list_url}")
-        self.page.goto(list_url)
+        self._goto(list_url)
 
         # networkidleの代わりに、商品リンク（aタグ）が1つでも表示されるまで待つ
         try:
@@ -229,17 +246,19 @@ class SuperDeliveryScraper:
         logger.info(f"商品URLを {len(urls)} 件取得しました。")
         return urls
 
-    def scrape_product_detail(self, url: str) -> List[Dict[str, str]]:
+    def scrape_product_detail(self, url: str) -> List[ProductVariation]:
         """商品詳細情報をスクレイピングする
 
         :param url: 商品詳細ページのURL
 
-        :return: 商品詳細情報の辞書
+        :return: 商品詳細情報（バリエーション単位）のリスト
+
+        :raises ScrapeFailedError: リトライしても取得できなかった場合
         """
         for attempt in range(config.MAX_RETRIS):
             try:
                 # wait_until="domcontentloaded" で高速化
-                self.page.goto(url, wait_until="domcontentloaded", timeout=30000)
+                self._goto(url, wait_until="domcontentloaded", timeout=30000)
 
                 # メンテナンス画面が出た場合の即時判定
                 if "メンテナンス中" in self.page.content():
@@ -293,22 +312,31 @@ class SuperDeliveryScraper:
                             wholesale_price = price_match.group(1).replace(",", "")
 
                     variation_results.append(
-                        {
-                            "商品名": product_name,
-                            "商品名2": name2,
-                            "JANコード": jan_code,
-                            "型番": model_number,
-                            "価格": wholesale_price,
-                            "詳細画面URL": url,
-                        }
+                        ProductVariation(
+                            product_name,
+                            name2,
+                            jan_code,
+                            model_number,
+                            wholesale_price,
+                            url,
+                        )
                     )
                 return variation_results
             except Exception as e:
                 logger.error(f"3回のリトライに失敗しました。: {e}")
-                # ループの最後なら空を返して終了、そうでなければ次へ
+                # ループの最後なら失敗として終了、そうでなければ次へ
                 if attempt == config.MAX_RETRIS - 1:
-                    return []
-        return []  # すべての試行が失敗した場合
+                    raise ScrapeFailedError(url) from e
+        # すべての試行が失敗した場合
+        raise ScrapeFailedError(url)
+
+    def _goto(self, url: str, **kwargs) -> None:
+        """リクエスト数を数えながらページ遷移する
+
+        :param url: 遷移先のURL
+        """
+        self.request_count += 1
+        self.page.goto(url, **kwargs)
 
     def get_text_safe(self, selector: str) -> str:
         """テキストを安全に取得する
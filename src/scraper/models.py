@@ -0,0 +1,32 @@
+from typing import Dict, NamedTuple, Tuple
+
+# フィールド名と出力時の列名（CSV/Excelのヘッダー）の対応
+COLUMN_NAMES: Dict[str, str] = {
+    "product_name": "商品名",
+    "name2": "商品名2",
+    "jan_code": "JANコード",
+    "model_number": "型番",
+    "price": "価格",
+    "url": "詳細画面URL",
+}
+
+
+class ProductVariation(NamedTuple):
+    """商品詳細1行分（バリエーション単位）のレコード
+
+    行ごとに辞書を作らずタプルで保持し、列名への変換は出力時のみ行う。
+    同一商品のバリエーションは商品名とURLの文字列オブジェクトを共有する。
+    """
+
+    product_name: str
+    name2: str
+    jan_code: str
+    model_number: str
+    price: str
+    url: str
+
+
+# 出力時のヘッダー（ProductVariationのフィールド順）
+PRODUCT_COLUMNS: Tuple[str, ...] = tuple(
+    COLUMN_NAMES[f] for f in ProductVariation._fields
+)
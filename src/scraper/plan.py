@@ -0,0 +1,233 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import pandas as pd
+
+import config
+
+logger = logging.getLogger("SD_Scraper")
+
+
+@dataclass(frozen=True)
+class CompanyPlan:
+    """1社分の巡回計画"""
+
+    name: str
+    url: str
+    start_page: int
+    end_page: int
+    min_sleep: float
+    max_sleep: float
+    weight: float = 1.0
+
+    @property
+    def pages(self) -> int:
+        """巡回する一覧ページ数"""
+        return max(self.end_page - self.start_page + 1, 0)
+
+    def estimated_requests(self) -> Tuple[int, int]:
+        """見積もりリクエスト数を返す
+
+        :return: (一覧ページのリクエスト数, 詳細ページのリクエスト数)
+        """
+        # 一覧は最大ページ数の取得分を加算。詳細は1ページあたりの最大件数で見積もる
+        return self.pages + 1, self.pages * config.ITEMS_PER_PAGE
+
+    def estimated_seconds(self) -> float:
+        """見積もり所要時間（秒）を返す"""
+        list_requests, detail_requests = self.estimated_requests()
+        list_wait = config.LIST_PAGE_WAIT + config.PAGE_LOAD_TIME
+        detail_wait = (self.min_sleep + self.max_sleep) / 2 + config.PAGE_LOAD_TIME
+        return list_requests * list_wait + detail_requests * detail_wait
+
+
+@dataclass(frozen=True)
+class CrawlPlan:
+    """設定と入力ファイルから作成した巡回計画"""
+
+    companies: Dict[str, CompanyPlan]
+    deadline: Optional[float] = None
+    request_budget: Optional[int] = None
+    dry_run: bool = False
+    skipped: FrozenSet[str] = field(default_factory=frozenset)
+
+    def estimated_requests(self) -> int:
+        """全社分の見積もりリクエスト数を返す"""
+        return sum(sum(c.estimated_requests()) for c in self.companies.values())
+
+    def estimated_seconds(self) -> float:
+        """全社分の見積もり所要時間（秒）を返す"""
+        return sum(c.estimated_seconds() for c in self.companies.values())
+
+    def describe(self) -> List[str]:
+        """巡回計画の内容を表示用の行に変換する
+
+        :return: 表示用の文字列のリスト
+        """
+        lines = ["=== 巡回計画 ==="]
+        for c in self.companies.values():
+            list_requests, detail_requests = c.estimated_requests()
+            lines.append(
+                f"{c.name}: {c.start_page}-{c.end_page}ページ / 優先度 {c.weight:g} / "
+                f"待機 {c.min_sleep:g}-{c.max_sleep:g}秒 / "
+                f"最大 {list_requests + detail_requests}リクエスト / "
+                f"約{c.estimated_seconds() / 60:.0f}分"
+            )
+        for name in sorted(self.skipped):
+            lines.append(f"{name}: 対象外")
+        lines.append(
+            f"合計: {len(self.companies)}社 / 最大 {self.estimated_requests()}リクエスト / "
+            f"約{self.estimated_seconds() / 3600:.1f}時間"
+        )
+        if self.deadline is not None:
+            deadline_str = datetime.fromtimestamp(self.deadline).strftime("%Y-%m-%d %H:%M")
+            lines.append(f"締切時刻: {deadline_str}")
+        if self.request_budget is not None:
+            lines.append(f"リクエスト上限: {self.request_budget}")
+        return lines
+
+
+def _parse_deadline(deadline_str: str) -> Optional[float]:
+    """締切時刻（HH:MM）を次に到来する時刻のUNIX時間に変換する
+
+    :param deadline_str: 締切時刻の文字列。空の場合は締切なし
+
+    :return: 締切時刻のUNIX時間。締切なしの場合はNone
+    """
+    if not deadline_str.strip():
+        return None
+    now = datetime.now()
+    hm = datetime.strptime(deadline_str.strip(), "%H:%M")
+    deadline = now.replace(hour=hm.hour, minute=hm.minute, second=0, microsecond=0)
+    if deadline <= now:
+        deadline += timedelta(days=1)
+    return deadline.timestamp()
+
+
+def _cell(values: Tuple[Any, ...], index: int) -> Optional[Any]:
+    """入力行の指定列の値を返す。列がない・空欄の場合はNone
+
+    :param values: 入力行の値
+    :param index: 列番号
+
+    :return: セルの値
+    """
+    if index >= len(values) or pd.isna(values[index]):
+        return None
+    return values[index]
+
+
+def _to_int(value: Any) -> int:
+    """セルの値を整数に変換する。小数部がある値は切り捨てずにエラーとする
+
+    :param value: セルの値
+
+    :return: 変換した整数
+
+    :raises ValueError: 整数として解釈できない場合
+    """
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"整数ではありません: {value}")
+    return int(number)
+
+
+def load_plan(input_file: str) -> CrawlPlan:
+    """設定（環境変数）と入力ファイルを一度だけ読み込み、巡回計画を作成する
+
+    入力ファイルの列: 会社名, URL, [優先度], [開始ページ], [終了ページ], [最小待機秒], [最大待機秒]
+    会社名かURLが空欄の行は警告を出してスキップする。会社名の重複はエラーとする。
+
+    :param input_file: 入力ファイル（Excel）のパス
+
+    :return: 巡回計画
+
+    :raises ValueError: 設定値または入力ファイルの内容が不正な場合
+    """
+    try:
+        start_page = int(os.getenv("START_PAGE", "1"))
+        end_page = int(os.getenv("END_PAGE", str(config.MAX_PAGES_PER_COMPANY)))
+        min_sleep = float(os.getenv("MIN_SLEEP", 2.0))
+        max_sleep = float(os.getenv("MAX_SLEEP", 4.0))
+        request_budget = int(os.getenv("REQUEST_BUDGET", "0"))
+        deadline = _parse_deadline(os.getenv("DEADLINE", ""))
+    except ValueError as e:
+        raise ValueError(f"settings.txtの値が不正です: {e}") from e
+    if start_page < 1 or start_page > end_page:
+        raise ValueError(
+            f"settings.txt: START_PAGE({start_page})とEND_PAGE({end_page})は1以上かつ開始≦終了で指定してください。"
+        )
+    if min_sleep < 0 or min_sleep > max_sleep:
+        raise ValueError(
+            f"settings.txt: MIN_SLEEP({min_sleep})とMAX_SLEEP({max_sleep})は0以上かつ最小≦最大で指定してください。"
+        )
+    if request_budget < 0:
+        raise ValueError(f"settings.txt: REQUEST_BUDGET({request_budget})は0以上で指定してください。")
+    dry_run = os.getenv("DRY_RUN", "false").lower() == "true"
+
+    target_str = os.getenv("TARGET_COMPANIES", "")
+    targets = frozenset(t.strip() for t in target_str.split(",") if t.strip())
+
+    df_input = pd.read_excel(input_file, header=None, dtype=object)
+
+    companies: Dict[str, CompanyPlan] = {}
+    skipped = set()
+    for row_num, values in enumerate(df_input.itertuples(index=False, name=None), start=1):
+        name, url = _cell(values, 0), _cell(values, 1)
+        if name is None or url is None:
+            logger.warning(f"入力ファイル{row_num}行目: 会社名またはURLが空欄のためスキップします。")
+            continue
+        name, url = str(name).strip(), str(url).strip()
+        # 特定の企業のみ絞りたい場合は企業名が合致しなければ対象外とする
+        if targets and name not in targets:
+            skipped.add(name)
+            continue
+        if name in companies:
+            raise ValueError(f"入力ファイル{row_num}行目: 会社名「{name}」が重複しています。")
+
+        weight_cell, start_cell, end_cell = _cell(values, 2), _cell(values, 3), _cell(values, 4)
+        min_sleep_cell, max_sleep_cell = _cell(values, 5), _cell(values, 6)
+        try:
+            weight = float(weight_cell) if weight_cell is not None else 1.0
+            company_start = _to_int(start_cell) if start_cell is not None else start_page
+            company_end = _to_int(end_cell) if end_cell is not None else end_page
+            company_min_sleep = (
+                float(min_sleep_cell) if min_sleep_cell is not None else min_sleep
+            )
+            company_max_sleep = (
+                float(max_sleep_cell) if max_sleep_cell is not None else max_sleep
+            )
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"入力ファイル{row_num}行目: 数値の列が不正です: {e}") from e
+        if weight <= 0 or company_start < 1 or company_start > company_end:
+            raise ValueError(
+                f"入力ファイル{row_num}行目: 優先度は正の数、ページ範囲は1以上かつ開始≦終了で指定してください。"
+            )
+        if company_min_sleep < 0 or company_min_sleep > company_max_sleep:
+            raise ValueError(
+                f"入力ファイル{row_num}行目: 待機秒数は0以上かつ最小≦最大で指定してください。"
+            )
+
+        companies[name] = CompanyPlan(
+            name=name,
+            url=url,
+            start_page=company_start,
+            end_page=company_end,
+            min_sleep=company_min_sleep,
+            max_sleep=company_max_sleep,
+            weight=weight,
+        )
+
+    for name in targets - companies.keys():
+        logger.warning(f"TARGET_COMPANIESの「{name}」は入力ファイルに存在しません。")
+
+    return CrawlPlan(
+        companies=companies,
+        deadline=deadline,
+        request_budget=request_budget or None,
+        dry_run=dry_run,
+        skipped=frozenset(skipped),
+    )
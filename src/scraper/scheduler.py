@@ -0,0 +1,247 @@
+import heapq
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import config
+
+logger = logging.getLogger("SD_Scraper")
+
+
+class CompanyQueue:
+    """1社分の詳細取得待ちURLと実績を保持するキュー"""
+
+    def __init__(self, name: str, weight: float = 1.0) -> None:
+        """コンストラクタ
+
+        :param name: 会社名
+        :param weight: 会社ごとの優先度（大きいほど多く時間を割り当てる）
+        """
+        self.name: str = name
+        self.weight: float = weight if weight > 0 else 1.0
+        # (-緊急度, 投入順, URL) のヒープ。緊急度が高いものから取り出す
+        self.heap: List[Tuple[float, int, str]] = []
+        self.spent: float = 0.0
+        self.fetched: int = 0
+        self.avg_cost: Optional[float] = None
+
+    def head_urgency(self) -> float:
+        """次に取り出すURLの緊急度を返す"""
+        return -self.heap[0][0] if self.heap else 0.0
+
+
+class CrawlScheduler:
+    """締切時刻とリクエスト上限を考慮して会社間で詳細取得を割り振るスケジューラ
+
+    会社ごとの消費時間を優先度で割った値が最も小さい会社から1件ずつ取り出す。
+    会社内では新着URL、次いで前回取得から時間が経ったURLを優先する。
+    一覧ページの巡回（URL収集）は締切・上限の一部（LIST_PHASE_SHARE）までに抑え、
+    残りを詳細取得に充てる。
+    """
+
+    def __init__(
+        self,
+        history: Dict[str, float],
+        deadline: Optional[float] = None,
+        request_budget: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """コンストラクタ
+
+        :param history: URLごとの前回取得時刻（UNIX時間）
+        :param deadline: 締切時刻（UNIX時間）。Noneの場合は無制限
+        :param request_budget: リクエスト数の上限。Noneの場合は無制限
+        :param clock: 現在時刻を返す関数
+        """
+        self.history = history
+        self.deadline = deadline
+        self.request_budget = request_budget
+        self.clock = clock
+        self.companies: Dict[str, CompanyQueue] = {}
+        self._seq = 0
+
+        # URL収集に使える締切・リクエスト数（残りは詳細取得用に確保する）
+        now = clock()
+        self.list_deadline: Optional[float] = (
+            now + max(deadline - now, 0.0) * config.LIST_PHASE_SHARE
+            if deadline is not None
+            else None
+        )
+        self.list_budget: Optional[int] = (
+            int(request_budget * config.LIST_PHASE_SHARE)
+            if request_budget is not None
+            else None
+        )
+
+    def plan_listing(self, weights: Dict[str, float], used_requests: int) -> List[str]:
+        """URL収集を行う会社を決め、URL収集用のリクエスト数を確保する
+
+        各社のURL収集は最低MIN_LIST_REQUESTS回、詳細取得は最低1件（MAX_RETRIS回）の
+        リクエストが必要なため、上限内で賄える社数に絞り、優先度の低い会社はURL収集を行わない。
+
+        :param weights: 会社名をキー、優先度を値とする辞書（入力順）
+        :param used_requests: これまでに使用したリクエスト数
+
+        :return: URL収集を行う会社名のリスト（入力順）
+        """
+        names = list(weights)
+        if self.request_budget is None:
+            return names
+
+        available = max(self.request_budget - used_requests, 0)
+        per_company = config.MIN_LIST_REQUESTS + config.MAX_RETRIS
+        affordable = min(len(names), available // per_company)
+        if affordable < len(names):
+            keep = set(sorted(names, key=lambda n: -weights[n])[:affordable])
+            dropped = [n for n in names if n not in keep]
+            logger.warning(
+                f"リクエスト上限が不足しているため、次の会社はURL収集を行いません: {', '.join(dropped)}"
+            )
+            names = [n for n in names if n in keep]
+
+        # 割合で決めた分が全社の最低限に満たない場合は増やし、詳細取得の最低限は残す
+        list_requests = max(
+            int(available * config.LIST_PHASE_SHARE), config.MIN_LIST_REQUESTS * affordable
+        )
+        list_requests = min(list_requests, available - config.MAX_RETRIS * affordable)
+        self.list_budget = used_requests + list_requests
+        return names
+
+    def listing_guard(
+        self, request_counter: Callable[[], int], companies_left: int
+    ) -> Callable[[], bool]:
+        """1社分のURL収集を打ち切るかを判定する関数を返す
+
+        URL収集用の残り時間・リクエスト数を未収集の会社数で等分し、1社が使い切らないようにする。
+
+        :param request_counter: 現在までのリクエスト数を返す関数
+        :param companies_left: この会社を含む未収集の会社数
+
+        :return: 打ち切るべき場合にTrueを返す関数
+        """
+        now = self.clock()
+        companies_left = max(companies_left, 1)
+        time_limit: Optional[float] = None
+        if self.list_deadline is not None:
+            time_limit = now + max(self.list_deadline - now, 0.0) / companies_left
+        request_limit: Optional[int] = None
+        if self.list_budget is not None:
+            used = request_counter()
+            request_limit = used + max(self.list_budget - used, 0) // companies_left
+
+        def should_stop() -> bool:
+            if time_limit is not None and self.clock() >= time_limit:
+                return True
+            return request_limit is not None and request_counter() >= request_limit
+
+        return should_stop
+
+    def add_company(
+        self, name: str, urls: List[str], weight: float = 1.0, list_cost: float = 0.0
+    ) -> None:
+        """会社と詳細取得対象URLを登録する
+
+        :param name: 会社名
+        :param urls: 商品詳細URLのリスト
+        :param weight: 会社ごとの優先度
+        :param list_cost: URL収集にかかった時間（秒）。消費時間に加算する
+        """
+        queue = self.companies.setdefault(name, CompanyQueue(name, weight))
+        queue.spent += list_cost
+        now = self.clock()
+        for url in urls:
+            heapq.heappush(queue.heap, (-self._urgency(url, now), self._seq, url))
+            self._seq += 1
+
+    def _urgency(self, url: str, now: float) -> float:
+        """URLの緊急度を算出する
+
+        :param url: 商品詳細URL
+        :param now: 現在時刻
+
+        :return: 緊急度（新着は最大、それ以外は前回取得からの経過日数に応じて増加）
+        """
+        last_fetched = self.history.get(url)
+        if last_fetched is None:
+            return config.NEW_LISTING_URGENCY
+        age_days = max(now - last_fetched, 0.0) / 86400
+        urgency = 1.0 + age_days / config.STALE_DAYS
+        return min(urgency, config.NEW_LISTING_URGENCY - 1.0)
+
+    def has_time(self, cost: float = 0.0) -> bool:
+        """締切までに指定秒数の処理を行う余裕があるかを判定する
+
+        :param cost: 見積もり処理時間（秒）
+
+        :return: 余裕があればTrue
+        """
+        return self.deadline is None or self.clock() + cost < self.deadline
+
+    def has_budget(self, used_requests: int, needed: int = 1) -> bool:
+        """リクエスト上限を超えずに指定数のリクエストを行えるかを判定する
+
+        :param used_requests: これまでに使用したリクエスト数
+        :param needed: これから行うリクエスト数
+
+        :return: 上限を超えなければTrue
+        """
+        return (
+            self.request_budget is None
+            or used_requests + needed <= self.request_budget
+        )
+
+    def next_item(self, used_requests: int) -> Optional[Tuple[str, str]]:
+        """次に取得すべき会社名とURLを返す
+
+        :param used_requests: これまでに使用したリクエスト数
+
+        :return: (会社名, URL)。締切・上限到達または対象がない場合はNone
+        """
+        # 詳細取得はリトライを含めて最大MAX_RETRIS回のリクエストになる
+        if not self.has_budget(used_requests, config.MAX_RETRIS):
+            if any(q.heap for q in self.companies.values()):
+                logger.warning("リクエスト上限に達したため、詳細取得を終了します。")
+            return None
+
+        best: Optional[CompanyQueue] = None
+        best_key: Tuple[float, int] = (0.0, 0)
+        for queue in self.companies.values():
+            if not queue.heap:
+                continue
+            # 締切までに1件分を終えられない会社は対象外
+            if not self.has_time(queue.avg_cost or 0.0):
+                continue
+            key = (queue.spent / (queue.weight * queue.head_urgency()), queue.fetched)
+            if best is None or key < best_key:
+                best, best_key = queue, key
+
+        if best is None:
+            if any(q.heap for q in self.companies.values()):
+                logger.warning("締切時刻に達したため、詳細取得を終了します。")
+            return None
+        _, _, url = heapq.heappop(best.heap)
+        return best.name, url
+
+    def record(self, name: str, url: str, cost: float, succeeded: bool = True) -> None:
+        """1件分の取得実績を記録する
+
+        取得に失敗した場合は消費時間のみ記録し、前回取得時刻は更新しない。
+
+        :param name: 会社名
+        :param url: 取得したURL
+        :param cost: 待機時間を含む処理時間（秒）
+        :param succeeded: 取得に成功したか
+        """
+        queue = self.companies[name]
+        queue.spent += cost
+        queue.fetched += 1
+        if queue.avg_cost is None:
+            queue.avg_cost = cost
+        else:
+            queue.avg_cost = 0.8 * queue.avg_cost + 0.2 * cost
+        if succeeded:
+            self.history[url] = self.clock()
+
+    def remaining(self) -> Dict[str, int]:
+        """会社ごとの未取得件数を返す"""
+        return {name: len(q.heap) for name, q in self.companies.items()}
@@ -1,22 +1,26 @@
 import csv
 import glob
+import json
 import logging
 import os
 import time
-from typing import List, Dict
+from typing import Dict, List, Sequence
 
 import pandas as pd
 
 logger = logging.getLogger("SD_Scraper")
 
 
-def save_to_csv_append(results: List[Dict[str, str]], csv_path: str) -> None:
+def save_to_csv_append(
+    results: List[Sequence[str]], csv_path: str, header: Sequence[str]
+) -> None:
     """データをCSVに追記保存する。
 
-    100件ごとの中間保存に使用。
+    100件ごとの中間保存に使用。列名はここで初めて付与する。
 
-    :param results: 保存するデータのリスト。
+    :param results: 保存するデータ（1行分の値の並び）のリスト。
     :param csv_path: 保存先のCSVファイルパス。
+    :param header: 新規作成時に書き込むヘッダー（列名）。
     """
     if not results:
         return
@@ -24,9 +28,9 @@ def save_to_csv_append(results: List[Dict[str, str]], csv_path: str) -> None:
     file_exists = os.path.exists(csv_path)
     # Excelで開いても文字化けしないように utf-8-sig を採用
     with open(csv_path, mode="a", encoding="utf-8-sig", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=results[0].keys())
+        writer = csv.writer(f)
         if not file_exists:
-            writer.writeheader()
+            writer.writerow(header)
         writer.writerows(results)
 
 
@@ -58,6 +62,63 @@ def convert_all_csv_to_excel(output_dir: str, output_excel: str) -> None:
                 logger.error(f"Sheet追加に失敗しました： {csv_file}: {e}")
 
 
+def load_crawl_history(history_path: str) -> Dict[str, float]:
+    """URLごとの前回取得時刻を読み込む。
+
+    :param history_path: 取得履歴ファイルのパス。
+
+    :return: URLをキー、前回取得時刻（UNIX時間）を値とする辞書。
+    """
+    if not os.path.exists(history_path):
+        return {}
+    try:
+        with open(history_path, encoding="utf-8") as f:
+            history = json.load(f)
+    except Exception as e:
+        logger.warning(f"取得履歴の読み込みに失敗しました。履歴なしで続行します: {e}")
+        return {}
+
+    # URLと取得時刻（数値）の辞書になっていない場合は壊れているとみなす
+    if not isinstance(history, dict) or not all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in history.values()
+    ):
+        logger.warning("取得履歴の形式が不正です。履歴なしで続行します。")
+        return {}
+    return history
+
+
+def save_crawl_history(
+    history: Dict[str, float], history_path: str, retention_days: int = 90
+) -> None:
+    """URLごとの前回取得時刻を保存する。
+
+    保持期間を過ぎたURLは削除し、書き込み途中で中断しても既存ファイルが壊れないよう
+    一時ファイルに書いてから置き換える。
+
+    :param history: URLをキー、前回取得時刻（UNIX時間）を値とする辞書。
+    :param history_path: 取得履歴ファイルのパス。
+    :param retention_days: 履歴を保持する日数。
+    """
+    cutoff = time.time() - retention_days * 86400
+    for url in [u for u, fetched_at in history.items() if fetched_at < cutoff]:
+        del history[url]
+
+    tmp_path = f"{history_path}.tmp"
+    try:
+        prepare_output_dir(os.path.dirname(history_path))
+        with open(tmp_path, mode="w", encoding="utf-8") as f:
+            json.dump(history, f)
+        os.replace(tmp_path, history_path)
+    except OSError as e:
+        # ウイルス対策ソフト等でファイルがロックされていても処理は継続する
+        logger.warning(f"取得履歴の保存に失敗しました: {e}")
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
 def prepare_output_dir(dir_path: str) -> None:
     """出力用ディレクトリが存在しない場合は作成する。
 